@@ -146,7 +146,7 @@ def slim(
     if not output_model:
         return model
     slimmed_info = summarize_model(model)
-    save(model, output_model, model_check)
+    save(model, output_model, model_check, slimmed_info["model_size"])
     if slimmed_info["model_size"] >= onnx.checker.MAXIMUM_PROTOBUF:
         model_size = model.ByteSize()
         slimmed_info["model_size"] = [model_size, slimmed_info["model_size"]]
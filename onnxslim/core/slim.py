@@ -84,11 +84,12 @@ def shape_infer(model: onnx.ModelProto):
         model = SymbolicShapeInference.infer_shapes(model, auto_merge=AUTO_MERGE)
     except Exception as err:
         logger.debug(f"onnxruntime shape infer failed, try onnx shape infer. {err}")
-        if model.ByteSize() >= checker.MAXIMUM_PROTOBUF:
+        model_size = model.ByteSize()
+        if model_size >= checker.MAXIMUM_PROTOBUF:
             tmp_dir = tempfile.TemporaryDirectory()
             tmp_path = os.path.join(tmp_dir.name, "tmp.onnx")
             tmp_infer_path = os.path.join(tmp_dir.name, "tmp_infer.onnx")
-            save(model, tmp_path)
+            save(model, tmp_path, model_size=model_size)
             onnx.shape_inference.infer_shapes_path(tmp_path, tmp_infer_path)
             model = onnx.load(tmp_infer_path)
         else:
@@ -40,6 +40,9 @@ from onnxslim.onnx_graphsurgeon.util import misc
 # Maps values from the AttributeType enum to their string representations, e.g., {1: "FLOAT"}
 ATTR_TYPE_MAPPING = {v: k for k, v in onnx.AttributeProto.AttributeType.items()}
 
+# Maps values from the DataType enum to their string representations, e.g., {1: "FLOAT"}
+DTYPE_NAME_MAPPING = {v: k for k, v in onnx.TensorProto.DataType.items()}
+
 # Maps an ONNX attribute to the corresponding Python property
 ONNX_PYTHON_ATTR_MAPPING = {
     "FLOAT": "f",
@@ -71,7 +74,7 @@ def get_onnx_tensor_shape(onnx_tensor: Union[onnx.ValueInfoProto, onnx.TensorPro
 
 def get_dtype_name(onnx_type):
     """Get the ONNX data type name from its integer representation."""
-    return {val: key for key, val in onnx.TensorProto.DataType.items()}[onnx_type]
+    return DTYPE_NAME_MAPPING[onnx_type]
 
 
 def get_itemsize(dtype):
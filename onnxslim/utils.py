@@ -1,14 +1,18 @@
+import hashlib
 import logging
+import math
 import os
 import sys
-from collections import defaultdict
+from collections import Counter
+from functools import reduce
+from operator import mul
 from typing import Dict, List, Optional, Tuple, Union
 
+from google.protobuf.message import EncodeError
 import numpy as np
 import onnx
 from onnx import checker
 
-import onnxslim.onnx_graphsurgeon as gs
 from onnxslim.misc.font import GREEN, WHITE
 from onnxslim.misc.tabulate import SEPARATING_LINE, tabulate
 from onnxslim.onnx_graphsurgeon.logger.logger import G_LOGGER
@@ -25,6 +29,29 @@ logging.basicConfig(
 logger = logging.getLogger("ONNXSlim")
 
 
+def _build_tensor_type_to_np_dtype() -> Dict[int, np.dtype]:
+    """Build the onnx -> numpy dtype lookup once, onnx.mapping is deprecated in newer onnx releases."""
+    try:
+        from onnx.helper import tensor_dtype_to_np_dtype
+    except ImportError:  # onnx < 1.13
+        from onnx.mapping import TENSOR_TYPE_TO_NP_TYPE
+
+        return dict(TENSOR_TYPE_TO_NP_TYPE)
+
+    tensor_type_to_np_dtype = {}
+    for onnx_dtype in onnx.TensorProto.DataType.values():
+        try:
+            tensor_type_to_np_dtype[onnx_dtype] = tensor_dtype_to_np_dtype(onnx_dtype)
+        except KeyError:  # UNDEFINED has no numpy counterpart
+            pass
+    return tensor_type_to_np_dtype
+
+
+tensor_type_to_np_dtype = _build_tensor_type_to_np_dtype()
+
+random_generator = np.random.default_rng()
+
+
 def init_logging(verbose=False):
     """Configure the logging settings for the application based on the verbosity level."""
     for handler in logging.root.handlers[:]:
@@ -47,9 +74,14 @@ def init_logging(verbose=False):
 
     G_LOGGER.colors = False
 
-    import onnxruntime as ort
+    # importing onnxruntime is slow, pipelines that never run it can skip this with ONNXSLIM_INIT_ORT=0
+    if os.getenv("ONNXSLIM_INIT_ORT", "1") != "0":
+        try:
+            import onnxruntime as ort
 
-    ort.set_default_logger_severity(3)
+            ort.set_default_logger_severity(3)
+        except ImportError:  # onnxruntime is an optional dependency
+            pass
 
 
 def format_bytes(size: Union[int, Tuple[int, ...]]) -> str:
@@ -60,12 +92,9 @@ def format_bytes(size: Union[int, Tuple[int, ...]]) -> str:
     formatted_sizes = []
 
     for size_in_bytes in size:
-        unit_index = 0
-        while size_in_bytes >= 1024 and unit_index < len(units) - 1:
-            size_in_bytes /= 1024
-            unit_index += 1
-
-        formatted_size = "{:.2f} {}".format(size_in_bytes, units[unit_index])
+        # every unit is 2**10 times the previous one, so the unit follows from the bit length directly
+        unit_index = min(max(int(size_in_bytes).bit_length() - 1, 0) // 10, len(units) - 1)
+        formatted_size = f"{size_in_bytes / (1 << (unit_index * 10)):.2f} {units[unit_index]}"
         formatted_sizes.append(formatted_size)
 
     if len(formatted_sizes) == 1:
@@ -75,78 +104,79 @@ def format_bytes(size: Union[int, Tuple[int, ...]]) -> str:
 
 
 def onnx_dtype_to_numpy(onnx_dtype: int) -> np.dtype:
-    import onnx.mapping as mapping
-
-    return np.dtype(mapping.TENSOR_TYPE_TO_NP_TYPE[onnx_dtype])
+    return tensor_type_to_np_dtype[onnx_dtype]
 
 
 def gen_onnxruntime_input_data(
     model: onnx.ModelProto, model_check_inputs: Optional[List[str]] = None
 ) -> Dict[str, np.ndarray]:
-    input_info = {}
+    check_inputs = dict(model_check_input.rsplit(":", 1) for model_check_input in model_check_inputs or [])
+
+    input_data_dict = {}
     for input_tensor in model.graph.input:
         name = input_tensor.name
-        shape = []
-        for dim in input_tensor.type.tensor_type.shape.dim:
-            if dim.HasField("dim_param"):
-                shape.append(dim.dim_param)
-            elif dim.HasField("dim_value"):
-                shape.append(dim.dim_value)
-            else:
-                shape.append(None)
+        value = check_inputs.get(name)
+        if value is not None and value.endswith(".npy"):
+            input_data_dict[name] = np.load(value)
+            continue
+
+        if value is not None:
+            shapes = [int(val) for val in value.split(",")]
+        else:  # symbolic or unknown dims fall back to 1
+            shapes = [
+                dim.dim_value if dim.WhichOneof("value") == "dim_value" else 1
+                for dim in input_tensor.type.tensor_type.shape.dim
+            ]
+        shapes = [shape if shape != -1 else 1 for shape in shapes] or [1]
         dtype = onnx_dtype_to_numpy(input_tensor.type.tensor_type.elem_type)
 
-        input_info[name] = {"shape": shape, "dtype": dtype}
-
-    if model_check_inputs:
-        for model_check_input in model_check_inputs:
-            key, value = model_check_input.rsplit(":", 1)
-            if value.endswith(".npy"):
-                if key not in input_info:
-                    raise Exception(
-                        f"model_check_input name:{key} not found in model, available keys: {' '.join(input_info.keys())}"
-                    )
-                data = np.load(value)
-                input_info[key] = {"data": data}
-            else:
-                values_list = [int(val) for val in value.split(",")]
-                if key in input_info:
-                    input_info[key]["shape"] = values_list
-                else:
-                    raise Exception(
-                        f"model_check_input name:{key} not found in model, available keys: {' '.join(input_info.keys())}"
-                    )
-
-    input_data_dict = {}
-    for name, info in input_info.items():
-        if "data" in info:
-            input_data_dict[name] = info["data"]
+        # integer inputs are often indices or shapes, zeros keep them in range
+        if dtype.kind in "iu":
+            random_data = np.zeros(shapes, dtype=dtype)
+        # generate floats at the target precision where numpy supports it instead of casting from float64
+        elif dtype in (np.float32, np.float64):
+            random_data = random_generator.random(shapes, dtype=dtype)
         else:
-            shapes = [shape if (shape != -1 and not isinstance(shape, str)) else 1 for shape in info["shape"]]
-            shapes = shapes or [1]
-            dtype = info["dtype"]
+            random_data = random_generator.random(shapes, dtype=np.float32).astype(dtype)
+        input_data_dict[name] = random_data
 
-            if dtype in {np.int32, np.int64}:
-                random_data = np.random.randint(10, size=shapes).astype(dtype)
-            else:
-                random_data = np.random.rand(*shapes).astype(dtype)
-            input_data_dict[name] = random_data
+    for key in check_inputs:
+        if key not in input_data_dict:
+            raise Exception(
+                f"model_check_input name:{key} not found in model, available keys: {' '.join(input_data_dict.keys())}"
+            )
 
     return input_data_dict
 
 
+def get_inference_session(onnx_model: Union[bytes, str]):
+    """Create an onnxruntime session for a serialized model or model path."""
+    import onnxruntime as rt
+
+    sess_options = rt.SessionOptions()
+    # sessions are only used to compare outputs, onnxruntime graph optimizations would just slow down session creation
+    sess_options.graph_optimization_level = rt.GraphOptimizationLevel.ORT_DISABLE_ALL
+
+    return rt.InferenceSession(onnx_model, sess_options, providers=["CPUExecutionProvider"])
+
+
 def onnxruntime_inference(model: onnx.ModelProto, input_data: dict) -> Dict[str, np.array]:
     import os
     import onnx
     import tempfile
-    import onnxruntime as rt
+    from onnx.external_data_helper import load_external_data_for_model
+
+    try:
+        # serializing already computes the message size, so avoid a separate ByteSize() pass
+        onnx_model = model.SerializeToString()
+    except (ValueError, EncodeError):  # raised for models larger than 2GB, depending on the protobuf backend
+        onnx_model = None
 
-    if model.ByteSize() >= onnx.checker.MAXIMUM_PROTOBUF:
+    # the pure-python protobuf backend serializes past 2GB, but onnxruntime cannot load such a model
+    if onnx_model is None or len(onnx_model) >= checker.MAXIMUM_PROTOBUF:
         tmp_dir = tempfile.TemporaryDirectory()
         tmp_path = os.path.join(tmp_dir.name, "tmp.onnx")
         location = os.path.basename(tmp_path) + ".data"
-        if os.path.exists(location):
-            os.remove(location)
         onnx.save(
             model,
             tmp_path,
@@ -155,18 +185,19 @@ def onnxruntime_inference(model: onnx.ModelProto, input_data: dict) -> Dict[str,
             location=location,
         )
         onnx_model = tmp_path
-    else:
-        onnx_model = model.SerializeToString()
 
-    sess = rt.InferenceSession(onnx_model, providers=["CPUExecutionProvider"])
-    onnx_output = sess.run(None, input_data)
+    try:
+        sess = get_inference_session(onnx_model)
+        onnx_output = sess.run(None, input_data)
+    finally:
+        if isinstance(onnx_model, str):
+            # saving moved the tensor data out of the proto, read it back in place instead of reparsing the whole model
+            load_external_data_for_model(model, tmp_dir.name)
+            tmp_dir.cleanup()
 
     output_names = [output.name for output in sess.get_outputs()]
     onnx_output = dict(zip(output_names, onnx_output))
 
-    if isinstance(onnx_model, str):
-        model = onnx.load(onnx_model)
-
     return onnx_output, model
 
 
@@ -194,39 +225,34 @@ def print_model_info_as_table(model_name: str, model_info_list: List[Dict], elap
             [SEPARATING_LINE] * (len(model_info_list) + 1),
         )
     )
-    all_inputs = list(model_info_list[0]["op_input_info"].keys())
+    input_info_list = [model_info["op_input_info"] for model_info in model_info_list]
+    output_info_list = [model_info.get("op_output_info", {}) for model_info in model_info_list]
+    op_counts_list = [model_info.get("op_type_counts", {}) for model_info in model_info_list]
 
-    for inputs in all_inputs:
-        input_info_list = [f"IN: {inputs}"]
-        for model_info in model_info_list:
-            inputs_shape = model_info["op_input_info"].get(inputs, "")
-            input_info_list.append(inputs_shape)
-        final_op_info.append(input_info_list)
-
-    all_outputs = {op_type for model_info in model_info_list for op_type in model_info.get("op_output_info", {})}
+    final_op_info.extend(
+        [f"IN: {inputs}"] + [input_info.get(inputs, "") for input_info in input_info_list]
+        for inputs in input_info_list[0]
+    )
 
-    for outputs in all_outputs:
-        output_info_list = [f"OUT: {outputs}"]
-        for model_info in model_info_list:
-            outputs_shape = model_info["op_output_info"].get(outputs, "")
-            output_info_list.append(outputs_shape)
-        final_op_info.append(output_info_list)
+    all_outputs = dict.fromkeys(outputs for output_info in output_info_list for outputs in output_info)
+    final_op_info.extend(
+        [f"OUT: {outputs}"] + [output_info.get(outputs, "") for output_info in output_info_list]
+        for outputs in all_outputs
+    )
 
     final_op_info.append([SEPARATING_LINE] * (len(model_info_list) + 1))
 
-    all_ops = {op_type for model_info in model_info_list for op_type in model_info.get("op_type_counts", {})}
-    sorted_ops = sorted(all_ops)
-    for op in sorted_ops:
-        op_info_list = [op]
-        float_number = model_info_list[0]["op_type_counts"].get(op, 0)
-        op_info_list.append(float_number)
-        for model_info in model_info_list[1:]:
-            slimmed_number = model_info["op_type_counts"].get(op, 0)
-            if float_number > slimmed_number:
-                slimmed_number = GREEN + str(slimmed_number) + WHITE
-            op_info_list.append(slimmed_number)
-
-        final_op_info.append(op_info_list)
+    all_ops = {op_type for op_counts in op_counts_list for op_type in op_counts}
+    for op in sorted(all_ops):
+        float_number = op_counts_list[0].get(op, 0)
+        slimmed_numbers = [op_counts.get(op, 0) for op_counts in op_counts_list[1:]]
+        final_op_info.append(
+            [op, float_number]
+            + [
+                GREEN + str(slimmed_number) + WHITE if float_number > slimmed_number else slimmed_number
+                for slimmed_number in slimmed_numbers
+            ]
+        )
     final_op_info.extend(
         (
             [SEPARATING_LINE] * (len(model_info_list) + 1),
@@ -266,34 +292,21 @@ def dump_model_info_to_disk(model_name: str, model_info: Dict):
     filename_without_extension, _ = os.path.splitext(os.path.basename(model_name))
     csv_file_path = f"{filename_without_extension}_model_info.csv"
     with open(csv_file_path, "a", newline="") as csvfile:  # Use 'a' for append mode
-        fieldnames = ["NodeName", "OpType", "OutputDtype", "OutputShape"]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer = csv.writer(csvfile)
 
         # If the file is empty, write the header
         if csvfile.tell() == 0:
-            writer.writeheader()
+            writer.writerow(["NodeName", "OpType", "OutputDtype", "OutputShape"])
+
+        # The first output row of a node carries NodeName and OpType, subsequent rows leave them empty
+        rows = []
+        for node_name, (op_type, output_info_list) in model_info["op_info"].items():
+            output_dtype, output_shape = output_info_list[0] if output_info_list else ("", "")
+            rows.append((node_name, op_type, output_dtype, output_shape))
+            rows.extend(("", "", output_dtype, output_shape) for output_dtype, output_shape in output_info_list[1:])
 
         # Write the data
-        for node_name, info in model_info["op_info"].items():
-            op_type, output_info_list = info
-            # Write the first row with actual NodeName and OpType
-            row_data_first = {
-                "NodeName": node_name,
-                "OpType": op_type,
-                "OutputDtype": output_info_list[0][0],  # First entry in the list
-                "OutputShape": output_info_list[0][1],  # First entry in the list
-            }
-            writer.writerow(row_data_first)
-
-            # Write subsequent rows with empty strings for NodeName and OpType
-            for output_dtype, output_shape in output_info_list[1:]:
-                row_data_empty = {
-                    "NodeName": "",
-                    "OpType": "",
-                    "OutputDtype": output_dtype,
-                    "OutputShape": output_shape,
-                }
-                writer.writerow(row_data_empty)
+        writer.writerows(rows)
     print(f"Model info written to {csv_file_path}")
 
 
@@ -308,6 +321,33 @@ def get_opset(model: onnx.ModelProto) -> int:
         return None
 
 
+def get_tensor_dtype_shape(tensor: onnx.ValueInfoProto) -> Tuple:
+    """Extract the data type and shape of an ONNX tensor."""
+    type_str = tensor_type_to_np_dtype.get(tensor.type.tensor_type.elem_type, "Unknown")
+    shape = None
+    if tensor.type.tensor_type.HasField("shape"):
+        shape = []
+        for dim in tensor.type.tensor_type.shape.dim:
+            if dim.HasField("dim_param"):
+                shape.append(dim.dim_param)
+            elif dim.HasField("dim_value"):
+                shape.append(dim.dim_value)
+            else:
+                shape.append(None)
+
+    return (type_str, shape)
+
+
+def get_shape(tensors) -> Dict[str, str]:
+    """Format the data type and shape of each tensor as a string keyed by tensor name."""
+    op_shape_info = {}
+    for tensor in tensors:
+        type_str, shape = get_tensor_dtype_shape(tensor)
+        op_shape_info[tensor.name] = f"{str(type_str)}: {tuple(shape) if shape else None}"
+
+    return op_shape_info
+
+
 def summarize_model(model: onnx.ModelProto) -> Dict:
     logger.debug("Start summarizing model.")
     model_info = {}
@@ -316,58 +356,34 @@ def summarize_model(model: onnx.ModelProto) -> Dict:
     model_info["model_size"] = model_size
 
     op_info = {}
-    op_type_counts = defaultdict(int)
-
-    def get_tensor_dtype_shape(tensor):
-        """Extract the data type and shape of an ONNX tensor."""
-        type_str = onnx.mapping.TENSOR_TYPE_TO_NP_TYPE.get(tensor.type.tensor_type.elem_type, "Unknown")
-        shape = None
-        if tensor.type.tensor_type.HasField("shape"):
-            shape = []
-            for dim in tensor.type.tensor_type.shape.dim:
-                if dim.HasField("dim_param"):
-                    shape.append(dim.dim_param)
-                elif dim.HasField("dim_value"):
-                    shape.append(dim.dim_value)
-                else:
-                    shape.append(None)
-
-        return (type_str, shape)
-
-    def get_shape(inputs: onnx.ModelProto) -> Dict[str, List[int]]:
-        op_shape_info = {}
-        for input in inputs:
-            type_str, shape = get_tensor_dtype_shape(input)
-            if shape:
-                op_shape_info[input.name] = f"{str(type_str)}: {tuple(shape)}"
-            else:
-                op_shape_info[input.name] = f"{str(type_str)}: None"
-
-        return op_shape_info
+    op_type_counts = Counter()
 
     value_info_dict = {value_info.name: value_info for value_info in model.graph.value_info}
 
-    def get_graph_node_info(graph: onnx.GraphProto) -> Dict[str, List[str]]:
-        for node in graph.node:
-            op_type = node.op_type
-            op_type_counts[op_type] += 1
-            for output in node.output:
-                shapes = []
-                if output in value_info_dict:
-                    tensor = value_info_dict[output]
-                    type_str, shape = get_tensor_dtype_shape(tensor)
-                    shapes.append([type_str, shape])
-
-            op_info[node.name] = [node.op_type, shapes]
-
-            for attr in node.attribute:
-                ATTR_TYPE_MAPPING = {v: k for k, v in onnx.AttributeProto.AttributeType.items()}
-                if attr.type in ATTR_TYPE_MAPPING:
-                    attr_str = ATTR_TYPE_MAPPING[attr.type]
-                    if attr_str == "GRAPH":
-                        get_graph_node_info(attr.g)
-
-    get_graph_node_info(model.graph)
+    # walk subgraphs with an explicit stack of node iterators instead of recursing, visiting each subgraph right after
+    # its parent node so op_info keeps the depth-first order
+    op_type_counts.update(node.op_type for node in model.graph.node)
+    node_iters = [iter(model.graph.node)]
+    while node_iters:
+        node = next(node_iters[-1], None)
+        if node is None:
+            node_iters.pop()
+            continue
+
+        shapes = []
+        if value_info_dict:  # empty when the model carries no shape inference results
+            shapes = [
+                list(get_tensor_dtype_shape(value_info_dict[output]))
+                for output in node.output
+                if output in value_info_dict
+            ]
+
+        op_info[node.name] = [node.op_type, shapes]
+
+        subgraphs = [attr.g for attr in node.attribute if attr.type == onnx.AttributeProto.GRAPH]
+        for subgraph in reversed(subgraphs):
+            op_type_counts.update(subgraph_node.op_type for subgraph_node in subgraph.node)
+            node_iters.append(iter(subgraph.node))
 
     model_info["op_set"] = str(get_opset(model))
     model_info["op_info"] = op_info
@@ -402,14 +418,55 @@ def check_onnx(model: onnx.ModelProto, model_check_inputs=None):
     return input_data_dict, raw_onnx_output, model
 
 
-def check_point(model: onnx.ModelProto):
-    """Imports an ONNX model checkpoint into a Graphsurgeon graph representation."""
-    return gs.import_onnx(model)
+def check_point(model: onnx.ModelProto) -> bytes:
+    """Computes a digest of an ONNX model graph, used to detect when optimization iterations have converged."""
+    graph = model.graph
+    initializer_dict = {initializer.name: initializer for initializer in graph.initializer}
+    value_info_dict = {value_info.name: value_info for value_info in graph.value_info}
+    constant_digests = {}
+    hasher = hashlib.blake2b()
+
+    def update(data: bytes):
+        """Feed length-prefixed data so that adjacent fields cannot run into each other."""
+        hasher.update(len(data).to_bytes(8, "little"))
+        hasher.update(data)
+
+    def constant_digest(name: str) -> bytes:
+        """Digest a constant by value only, the optimizer may rename folded constants on every iteration."""
+        if name not in constant_digests:
+            constant = onnx.TensorProto()
+            constant.CopyFrom(initializer_dict[name])
+            constant.ClearField("name")
+            constant_digests[name] = hashlib.blake2b(constant.SerializeToString()).digest()
+        return constant_digests[name]
+
+    # mirror onnx_graphsurgeon graph equality: nodes, variables by name, dtype and shape, constants by value, and opsets
+    # hash the graph piece by piece, serializing it whole would fail for models larger than 2GB
+    for protos in (model.opset_import, graph.input, graph.output):
+        update(len(protos).to_bytes(8, "little"))
+        for proto in protos:
+            update(proto.SerializeToString())
+
+    update(len(graph.node).to_bytes(8, "little"))
+    for node in graph.node:
+        update(f"{node.name}\0{node.op_type}\0{node.domain}".encode())
+        update(len(node.attribute).to_bytes(8, "little"))
+        for attr in node.attribute:
+            update(attr.SerializeToString())
+        update(len(node.input).to_bytes(8, "little"))
+        for name in node.input:
+            update(constant_digest(name) if name in initializer_dict else name.encode())
+        update(len(node.output).to_bytes(8, "little"))
+        for name in node.output:
+            update(name.encode())
+            update(value_info_dict[name].type.SerializeToString() if name in value_info_dict else b"")
+
+    return hasher.digest()
 
 
 def is_converged(model: onnx.ModelProto, graph_ckpt, iter: int) -> bool:
     logger.debug(f"optimization iter: {iter}")
-    graph = gs.import_onnx(model)
+    graph = check_point(model)
     if graph == graph_ckpt:
         print(f"converged at iter: {iter}")
         return None
@@ -418,8 +475,10 @@ def is_converged(model: onnx.ModelProto, graph_ckpt, iter: int) -> bool:
         return False
 
 
-def save(model: onnx.ModelProto, model_path: str, model_check: bool = False):
-    """Save an ONNX model to a specified path, with optional model checking for validity."""
+def save(model: onnx.ModelProto, model_path: str, model_check: bool = False, model_size: Optional[int] = None):
+    """Save an ONNX model to a specified path, with optional model checking for validity and an optional precomputed
+    model_size.
+    """
     if model_check:
         try:
             checker.check_model(model)
@@ -427,7 +486,9 @@ def save(model: onnx.ModelProto, model_path: str, model_check: bool = False):
             logger.warning("Model too large and cannot be checked.")
 
     if model_path:  # model larger than 2GB can be saved, but compiler like trtexec won't parse it
-        if model.ByteSize() <= checker.MAXIMUM_PROTOBUF:
+        if model_size is None:
+            model_size = model.ByteSize()
+        if model_size <= checker.MAXIMUM_PROTOBUF:
             onnx.save(model, model_path)
         else:
             import os
@@ -455,18 +516,18 @@ def check_result(raw_onnx_output, slimmed_onnx_output):
         logger.warning(f"Slimmed model output keys: {slimmed_onnx_output.keys()}")
         logger.warning("Please check the model carefully.")
         return
-    else:
-        for key in raw_onnx_output.keys():
-            if not np.allclose(
-                raw_onnx_output[key],
-                slimmed_onnx_output[key],
-                rtol=1e-03,
-                atol=1e-04,
-                equal_nan=True,
-            ):
-                logger.warning("Model output mismatch after slimming.")
-                logger.warning("Please check the model carefully.")
-                return
+
+    for key in raw_onnx_output.keys():
+        if not np.allclose(
+            raw_onnx_output[key],
+            slimmed_onnx_output[key],
+            rtol=1e-03,
+            atol=1e-04,
+            equal_nan=True,
+        ):
+            logger.warning("Model output mismatch after slimming.")
+            logger.warning("Please check the model carefully.")
+            return
 
 
 data_type_sizes = {
@@ -479,14 +540,45 @@ data_type_sizes = {
     onnx.TensorProto.UINT16: 2,
     onnx.TensorProto.INT16: 2,
     onnx.TensorProto.BOOL: 1,
+    onnx.TensorProto.FLOAT16: 2,
+    onnx.TensorProto.BFLOAT16: 2,
+    onnx.TensorProto.UINT32: 4,
+    onnx.TensorProto.UINT64: 8,
+    onnx.TensorProto.COMPLEX64: 8,
+    onnx.TensorProto.COMPLEX128: 16,
 }
 
+# dtypes only available in newer onnx releases, sub-byte types are stored packed
+data_type_sizes.update(
+    {
+        getattr(onnx.TensorProto, name): size
+        for name, size in (
+            ("FLOAT8E4M3FN", 1),
+            ("FLOAT8E4M3FNUZ", 1),
+            ("FLOAT8E5M2", 1),
+            ("FLOAT8E5M2FNUZ", 1),
+            ("UINT4", 0.5),
+            ("INT4", 0.5),
+            ("FLOAT4E2M1", 0.5),
+        )
+        if hasattr(onnx.TensorProto, name)
+    }
+)
+
 
 def calculate_tensor_size(tensor):
-    shape = tensor.dims
-    num_elements = np.prod(shape) if shape else 0
-    element_size = data_type_sizes.get(tensor.data_type, 0)
-    return num_elements * element_size
+    """Return the number of bytes held by a TensorProto's data."""
+    if tensor.data_location == onnx.TensorProto.EXTERNAL:
+        for entry in tensor.external_data:
+            if entry.key == "length":
+                return int(entry.value)
+
+    if tensor.data_type in data_type_sizes:
+        num_elements = reduce(mul, tensor.dims, 1)
+        return math.ceil(num_elements * data_type_sizes[tensor.data_type])
+
+    # reading raw_data copies the whole buffer, so only fall back to it for unknown dtypes
+    return len(tensor.raw_data) if tensor.HasField("raw_data") else 0
 
 
 def get_model_size_and_initializer_size(model):
@@ -503,8 +595,5 @@ def get_model_subgraph_size(model):
     graph = model.graph
     for node in graph.node:
         for attr in node.attribute:
-            ATTR_TYPE_MAPPING = {v: k for k, v in onnx.AttributeProto.AttributeType.items()}
-            if attr.type in ATTR_TYPE_MAPPING:
-                attr_str = ATTR_TYPE_MAPPING[attr.type]
-                if attr_str == "GRAPH":
-                    print("subgraph", attr.g.ByteSize())
+            if attr.type == onnx.AttributeProto.GRAPH:
+                print("subgraph", attr.g.ByteSize())
@@ -0,0 +1,114 @@
+import csv
+import os
+from unittest import mock
+
+import numpy as np
+import onnx
+import pytest
+from onnx import TensorProto, helper, numpy_helper
+
+import onnxslim.core.slim
+from onnxslim import slim
+from onnxslim.utils import gen_onnxruntime_input_data, summarize_model
+
+
+class TestUtils:
+    def test_folded_shape_converges(self, request):
+        # Shape is folded into a constant that the optimizer renames on every iteration
+        x = helper.make_tensor_value_info("x", TensorProto.FLOAT, ["N", 3, 4])
+        y = helper.make_tensor_value_info("y", TensorProto.FLOAT, None)
+        w = numpy_helper.from_array(np.ones((4, 4), np.float32), "w")
+        idx = numpy_helper.from_array(np.array(0, np.int64), "idx")
+        nodes = [
+            helper.make_node("MatMul", ["x", "w"], ["m"], name="matmul"),
+            helper.make_node("Shape", ["m"], ["s"], name="shape"),
+            helper.make_node("Reshape", ["m", "s"], ["r1"], name="reshape_0"),
+            helper.make_node("Reshape", ["r1", "s"], ["r2"], name="reshape_1"),
+            helper.make_node("Relu", ["r2"], ["relu"], name="relu"),
+            helper.make_node("Gather", ["relu", "idx"], ["y"], name="gather", axis=0),
+        ]
+        graph = helper.make_graph(nodes, "graph", [x], [y], [w, idx])
+        model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+
+        directory = "tmp/" + request.node.name
+        os.makedirs(directory, exist_ok=True)
+
+        filename = f"{directory}/{request.node.name}.onnx"
+        onnx.save(model, filename)
+
+        with mock.patch("onnxslim.core.slim.optimize", wraps=onnxslim.core.slim.optimize) as optimize:
+            slim(filename, filename)
+
+        assert optimize.call_count < 10
+
+    def test_summarize_split(self, request):
+        x = helper.make_tensor_value_info("x", TensorProto.FLOAT, [4, 6])
+        y = helper.make_tensor_value_info("y", TensorProto.FLOAT, None)
+        nodes = [
+            helper.make_node("Split", ["x"], ["s0", "s1", "s2"], name="split", axis=1),
+            helper.make_node("Concat", ["s0", "s1", "s2"], ["y"], name="concat", axis=1),
+        ]
+        graph = helper.make_graph(nodes, "graph", [x], [y])
+        model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+        model = onnx.shape_inference.infer_shapes(model)
+
+        model_info = summarize_model(model)
+
+        assert model_info["op_info"]["split"] == ["Split", [[np.dtype("float32"), [4, 2]]] * 3]
+
+    def test_inspect_dump_to_disk_without_value_info(self, request, monkeypatch):
+        x = helper.make_tensor_value_info("x", TensorProto.FLOAT, [2, 3])
+        y = helper.make_tensor_value_info("y", TensorProto.FLOAT, [2, 3])
+        nodes = [
+            helper.make_node("Relu", ["x"], ["relu"], name="relu"),
+            helper.make_node("Neg", ["relu"], ["y"], name="neg"),
+        ]
+        graph = helper.make_graph(nodes, "graph", [x], [y])
+        model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+
+        directory = "tmp/" + request.node.name
+        os.makedirs(directory, exist_ok=True)
+        monkeypatch.chdir(directory)
+
+        filename = f"{request.node.name}.onnx"
+        onnx.save(model, filename)
+
+        csv_file_path = f"{request.node.name}_model_info.csv"
+        if os.path.exists(csv_file_path):  # the dump appends to an existing file
+            os.remove(csv_file_path)
+
+        slim(filename, inspect=True, dump_to_disk=True)
+
+        with open(csv_file_path) as csvfile:
+            rows = list(csv.reader(csvfile))
+
+        assert rows == [
+            ["NodeName", "OpType", "OutputDtype", "OutputShape"],
+            ["relu", "Relu", "", ""],
+            ["neg", "Neg", "", ""],
+        ]
+
+    def test_gen_input_data_unset_dim(self, request):
+        x = helper.make_tensor_value_info("x", TensorProto.FLOAT, ["N", 3])
+        x.type.tensor_type.shape.dim.add()  # neither dim_value nor dim_param is set
+        ids = helper.make_tensor_value_info("ids", TensorProto.INT64, [None])
+        graph = helper.make_graph([], "graph", [x, ids], [])
+        model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+
+        input_data = gen_onnxruntime_input_data(model)
+
+        assert input_data["x"].shape == (1, 3, 1)
+        assert input_data["x"].dtype == np.float32
+        assert input_data["ids"].shape == (1,)
+        assert input_data["ids"].dtype == np.int64
+
+
+if __name__ == "__main__":
+    pytest.main(
+        [
+            "-p",
+            "no:warnings",
+            "-sv",
+            "tests/test_utils.py",
+        ]
+    )